@@ -0,0 +1,48 @@
+"""
+CSR assembly kernel for the hashing trick used by `forcast.py`.
+
+Callers hash every feature key to a signed 32-bit int once (murmurhash3) and pass flat,
+contiguous buffers; `build_csr` writes the (indices, data, indptr) triple of a
+`scipy.sparse.csr_matrix` into caller-owned output buffers (so they can be reused across
+calls), following FeatureHasher's layout: column = |h| & mask and a negative hash flips the
+sign of the value. Only the first nnz / n_rows + 1 slots of the outputs are written.
+
+The loop is compiled with Numba when it is installed (`pip install numba`); otherwise an
+equivalent pure-NumPy version is used.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # optional dependency
+    njit = None
+
+
+def _build_csr_loop(key_hashes: np.ndarray, values: np.ndarray, row_lengths: np.ndarray, n_rows: int,
+                    mask: int, indices: np.ndarray, data: np.ndarray, indptr: np.ndarray) -> None:
+    indptr[0] = 0
+    for r in range(n_rows):
+        indptr[r + 1] = indptr[r] + row_lengths[r]
+    for p in range(key_hashes.shape[0]):
+        h = key_hashes[p]
+        if h >= 0:
+            indices[p] = h & mask
+            data[p] = values[p]
+        else:
+            indices[p] = -h & mask
+            data[p] = -values[p]
+
+
+def _build_csr_numpy(key_hashes: np.ndarray, values: np.ndarray, row_lengths: np.ndarray, n_rows: int,
+                     mask: int, indices: np.ndarray, data: np.ndarray, indptr: np.ndarray) -> None:
+    nnz = key_hashes.shape[0]
+    indices[:nnz] = np.abs(key_hashes) & mask
+    np.copyto(data[:nnz], values)
+    np.negative(data[:nnz], out=data[:nnz], where=key_hashes < 0)
+    indptr[0] = 0
+    np.cumsum(row_lengths[:n_rows], out=indptr[1:n_rows + 1])
+
+
+build_csr = njit(cache=True)(_build_csr_loop) if njit is not None else _build_csr_numpy
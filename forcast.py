@@ -10,19 +10,26 @@ and immediately makes smarter predictions for sales.
   plus date-derived features (day_of_week, month) and any numeric context you provide (e.g., leads, avg_ticket).
 - **Online learning**: updates the model instantly after you enter the actual sales.
 - **No schema headaches**: uses a hashing trick, so you can type any categorical strings without pre-fitting encoders.
-- **Persists** the model to `sales_model.joblib` so it keeps improving across runs.
+- **Persists** the model to `sales_model.pkl` (settings) + `sales_model.pkl.bin` (raw weights), plus a
+  small Zstd-compressed log of changed weights, `sales_model.pkl.delta`, so it keeps improving across runs.
+  A `sales_model.joblib` / `sales_model.npy` from an older version is converted on first start.
 
 🧠 Tech
-- Feature vectorization: `sklearn.feature_extraction.FeatureHasher` (fit-free, supports streaming)
-- Model: `sklearn.linear_model.SGDRegressor` with `partial_fit` (incremental updates)
+- Feature vectorization: hashing trick (murmurhash3 + bit-mask) straight into a CSR matrix (fit-free, supports streaming);
+  the assembly loop lives in `_numba_hash.py` and is JIT-compiled when Numba is installed
+- Model: `sklearn.linear_model.SGDRegressor` with `partial_fit` (incremental updates); small online
+  updates take a NumPy shortcut (`SalesSGDRegressor.fast_partial_fit`) around sklearn's per-call overhead
 
 📦 Dependencies
-- Python 3.9+
+- Python 3.10+
 - scikit-learn
-- joblib
+- pandas (CSV warm-start)
+- zstandard
+- numba (optional, speeds up feature hashing)
 
 Install:
-    pip install scikit-learn joblib
+    pip install scikit-learn pandas zstandard
+    pip install numba  # optional
 
 Run:
     python sales_realtime_cli.py
@@ -37,22 +44,96 @@ Tip: If you don't have `regain` as a concept, just press Enter when asked.
 """
 from __future__ import annotations
 import argparse
-import csv
+import atexit
 import json
 import os
-from dataclasses import dataclass, asdict
+import pickle
+import struct
+import time
+from dataclasses import dataclass, field, asdict
 from datetime import datetime
-from typing import Dict, List, Optional
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 
-import joblib
 import numpy as np
-from sklearn.feature_extraction import FeatureHasher
+import pandas as pd
+import zstandard
+from scipy.sparse import csr_matrix
 from sklearn.linear_model import SGDRegressor
-
-MODEL_PATH = "sales_model.joblib"
-
-
-@dataclass
+from sklearn.utils import murmurhash3_32
+
+from _numba_hash import build_csr
+
+MODEL_PATH = "sales_model.pkl"  # pickled model settings; weights live out-of-band next to it
+# Formats written by earlier versions; read once and converted to MODEL_PATH (newest first).
+LEGACY_MODEL_PATHS = ("sales_model.npy", "sales_model.joblib")
+BUFFERS_SUFFIX = ".bin"  # appended to the model path for the pickle's out-of-band weight buffers
+DELTA_SUFFIX = ".delta"  # appended to the model path for the log of incremental saves
+ZSTD_LEVEL = 1  # delta records are tiny; favour speed over ratio
+BATCH_SIZE = 16  # interactive labels are buffered and learned in mini-batches of this size
+SAVE_MIN_INTERVAL_S = 2.0  # maybe_save() debounce: save at most this often...
+SAVE_EVERY_N = 4 * BATCH_SIZE  # ...unless this many labels have been learned since the last save
+# Warm-start epochs, one per entry: small partial_fit batches first, then the whole dataset (None).
+WARMSTART_BATCH_LADDER = (32, 128, None)
+WARMSTART_CHUNK_ROWS = 10_000  # CSV rows read (and learned from) at a time
+# Features, targets and weights are single precision: plenty for noisy sales data, and it halves
+# the memory traffic of coef_ (SGDRegressor keeps float32 inputs in float32 end to end).
+DTYPE = np.float32
+
+
+_DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def _zeller(y: int, m: int, d: int) -> int:
+    """Day of week via Zeller's congruence, 0=Mon to match datetime.weekday()."""
+    if m < 3:  # Jan/Feb count as months 13/14 of the previous year
+        m += 12
+        y -= 1
+    h = (d + 13 * (m + 1) // 5 + y + y // 4 - y // 100 + y // 400) % 7  # 0=Sat
+    return (h + 5) % 7
+
+
+def _date_features(date: str) -> Optional[Tuple[int, int]]:
+    """Return (day_of_week, month) for a YYYY-MM-DD string, or None if it is malformed."""
+    if not isinstance(date, str):
+        return None
+    # Fast path: slice the canonical layout by hand instead of running strptime's format interpreter.
+    digits = date[:4] + date[5:7] + date[8:10]
+    if len(date) == 10 and date[4] == "-" and date[7] == "-" and digits.isascii() and digits.isdigit():
+        y, m, d = int(digits[:4]), int(digits[4:6]), int(digits[6:])
+        if y < 1 or not 1 <= m <= 12:
+            return None
+        leap = m == 2 and y % 4 == 0 and (y % 100 != 0 or y % 400 == 0)
+        if not 1 <= d <= _DAYS_IN_MONTH[m - 1] + leap:
+            return None
+        return _zeller(y, m, d), m
+    # Anything else (e.g. unpadded "2025-8-1") goes through the strict parser
+    try:
+        dt = datetime.strptime(date, "%Y-%m-%d")
+    except Exception:
+        return None
+    return dt.weekday(), dt.month  # 0=Mon
+
+
+# Feature keys are pre-hashed: murmurhash3_32 of "prefix=value" (the same strings
+# FeatureHasher used to see), so emitting a feature never builds or hashes a string
+# once its value has been seen before. Builtin hash() is not an option: str hashes are
+# salted per process, which would scramble a persisted model's weights on the next run.
+_DOW_KEYS = tuple(murmurhash3_32(f"dow={i}") for i in range(7))
+_MONTH_KEYS = (0,) + tuple(murmurhash3_32(f"month={m}") for m in range(1, 13))  # indexed by month
+_DOW_KEY_ARRAY = np.array(_DOW_KEYS, dtype=np.int64)
+_MONTH_KEY_ARRAY = np.array(_MONTH_KEYS, dtype=np.int64)
+_LEADS_KEY = murmurhash3_32("leads")
+_AVG_TICKET_KEY = murmurhash3_32("avg_ticket")
+
+
+@lru_cache(maxsize=4096)
+def _feature_key(prefix: str, value) -> int:
+    """Hash of a categorical feature, memoized per (prefix, value)."""
+    return murmurhash3_32(f"{prefix}{value}")
+
+
+@dataclass(slots=True)
 class Sample:
     region: str
     sector: str
@@ -61,40 +142,164 @@ class Sample:
     leads: Optional[float] = None
     avg_ticket: Optional[float] = None
     # you can freely add more numeric keys later via the CLI JSON mode
-
-    def to_feature_dict(self) -> Dict[str, float]:
-        # Categorical features as strings (hashed by FeatureHasher)
-        d: Dict[str, float] = {
-            f"region={self.region}": 1.0,
-            f"sector={self.sector}": 1.0,
-        }
-        if self.regain:
-            d[f"regain={self.regain}"] = 1.0
-
-        # Date derived features
-        try:
-            dt = datetime.strptime(self.date, "%Y-%m-%d")
-            d[f"dow={dt.weekday()}"] = 1.0  # 0=Mon
-            d[f"month={dt.month}"] = 1.0
-        except Exception:
-            # If date is malformed, ignore date-derived features
-            pass
-
-        # Numeric features (if provided)
-        if self.leads is not None:
-            d["leads"] = float(self.leads)
-        if self.avg_ticket is not None:
-            d["avg_ticket"] = float(self.avg_ticket)
-
-        return d
+    # Lazily built feature dict; predict + partial_fit on the same sample reuse it.
+    _features: Optional[Dict[int, float]] = field(default=None, init=False, repr=False, compare=False)
+    # Which optional fields are set (_HAS_* bits); picks the specialized dict builder.
+    _shape: int = field(default=0, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._shape = _sample_shape(self)
+
+    def invalidate(self) -> None:
+        """Drop the cached feature dict; call after mutating any field."""
+        self._features = None
+        self._shape = _sample_shape(self)
+
+    def to_feature_dict(self) -> Dict[int, float]:
+        if self._features is None:
+            self._features = _FEATURE_BUILDERS[self._shape](self)
+        return self._features
+
+
+_HAS_REGAIN, _HAS_LEADS, _HAS_AVG_TICKET = 1, 2, 4
+_ALL_PROVIDED = _HAS_REGAIN | _HAS_LEADS | _HAS_AVG_TICKET
+
+
+def _sample_shape(s: Sample) -> int:
+    return ((_HAS_REGAIN if s.regain else 0)
+            | (_HAS_LEADS if s.leads is not None else 0)
+            | (_HAS_AVG_TICKET if s.avg_ticket is not None else 0))
+
+
+def _feature_dict_full(s: Sample) -> Dict[int, float]:
+    # Every optional field is set (the usual CLI case): only the date can still be unusable.
+    d: Dict[int, float] = {
+        _feature_key("region=", s.region): 1.0,
+        _feature_key("sector=", s.sector): 1.0,
+        _feature_key("regain=", s.regain): 1.0,
+        _LEADS_KEY: float(s.leads),
+        _AVG_TICKET_KEY: float(s.avg_ticket),
+    }
+    parts = _date_features(s.date)
+    if parts is not None:
+        d[_DOW_KEYS[parts[0]]] = 1.0
+        d[_MONTH_KEYS[parts[1]]] = 1.0
+    return d
+
+
+def _feature_dict_partial(s: Sample) -> Dict[int, float]:
+    # Keys are feature hashes (see _feature_key); OnlineSalesPredictor._vectorize folds them.
+    d: Dict[int, float] = {
+        _feature_key("region=", s.region): 1.0,
+        _feature_key("sector=", s.sector): 1.0,
+    }
+    if s.regain:
+        d[_feature_key("regain=", s.regain)] = 1.0
+
+    # Date derived features (ignored if the date is malformed)
+    parts = _date_features(s.date)
+    if parts is not None:
+        d[_DOW_KEYS[parts[0]]] = 1.0
+        d[_MONTH_KEYS[parts[1]]] = 1.0
+
+    # Numeric features (if provided)
+    if s.leads is not None:
+        d[_LEADS_KEY] = float(s.leads)
+    if s.avg_ticket is not None:
+        d[_AVG_TICKET_KEY] = float(s.avg_ticket)
+
+    return d
+
+
+# Indexed by Sample._shape.
+_FEATURE_BUILDERS = tuple(_feature_dict_full if shape == _ALL_PROVIDED else _feature_dict_partial
+                          for shape in range(_ALL_PROVIDED + 1))
+
+
+# Feature slots per row in Sample.to_feature_dict / _vectorize_columns; sizes the CSR buffers.
+_MAX_ROW_NNZ = 7
+_CSR_BUFFER_ROWS = 1024
+
+_FALLBACK_L1D_BYTES = 32 * 1024
+_SYSFS_CACHE_DIR = "/sys/devices/system/cpu/cpu0/cache"
+
+
+def _l1_dcache_bytes() -> int:
+    """Size of the L1 data cache: sysconf, then Linux sysfs, then a 32 KiB guess."""
+    try:
+        size = os.sysconf("SC_LEVEL1_DCACHE_SIZE")
+        if size > 0:
+            return size
+    except (AttributeError, ValueError, OSError):
+        pass
+    try:
+        for entry in sorted(os.listdir(_SYSFS_CACHE_DIR)):
+            base = os.path.join(_SYSFS_CACHE_DIR, entry)
+            with open(os.path.join(base, "level")) as f:
+                level = f.read().strip()
+            with open(os.path.join(base, "type")) as f:
+                kind = f.read().strip()
+            if level == "1" and kind in ("Data", "Unified"):
+                with open(os.path.join(base, "size")) as f:
+                    size = f.read().strip()
+                return int(size[:-1]) * 1024 if size.endswith("K") else int(size)
+    except (OSError, ValueError):
+        pass
+    return _FALLBACK_L1D_BYTES
+
+
+def _cache_fit_n_features() -> int:
+    """Largest power of two whose coef_ fills at most half of L1d, leaving room for the gathers."""
+    target = _l1_dcache_bytes() // 2 // np.dtype(DTYPE).itemsize
+    return 1 << max(target.bit_length() - 1, 0)
+
+
+# Interactive updates (flush/partial_fit) of at most this many rows skip sklearn and use
+# SalesSGDRegressor.fast_partial_fit; warm-start always goes through sklearn's partial_fit.
+FAST_UPDATE_MAX_ROWS = BATCH_SIZE
+_SPARSE_INTERCEPT_DECAY = 0.01  # sklearn damps intercept updates by this factor on sparse input
+
+
+class SalesSGDRegressor(SGDRegressor):
+    """SGDRegressor plus a NumPy fast path for tiny online updates on an already-fitted model."""
+
+    def fast_partial_fit(self, X: csr_matrix, y: np.ndarray) -> None:
+        # One plain squared-loss SGD step per row at the constant rate eta0 ("adaptive" never
+        # decays it under partial_fit), mirroring sklearn's sparse update. The L2 decay is only
+        # applied to the coefficients a row touches, which is what makes the step O(nnz).
+        # Rows are taken in arrival order (no shuffle), as befits a stream of daily labels.
+        # Two keys of a row can hash to the same column; their values are summed first, since
+        # the fancy-indexed write below would otherwise keep only the last one's update.
+        X = X.copy()
+        X.sum_duplicates()
+        coef = self.coef_
+        intercept = self.intercept_
+        lr, alpha = self.eta0, self.alpha
+        for row in range(X.shape[0]):
+            lo, hi = X.indptr[row], X.indptr[row + 1]
+            idx = X.indices[lo:hi]
+            val = X.data[lo:hi]
+            w = coef[idx]
+            grad = np.dot(w, val) + intercept[0] - y[row]
+            coef[idx] = w - lr * (grad * val + alpha * w)
+            intercept[0] -= lr * grad * _SPARSE_INTERCEPT_DECAY
+        self.t_ += X.shape[0]
 
 
 class OnlineSalesPredictor:
-    def __init__(self, n_features: int = 2 ** 12, random_state: int = 42):
-        # FeatureHasher is stateless (no fit required), perfect for streaming.
-        self.hasher = FeatureHasher(n_features=n_features, input_type="dict")
+    def __init__(self, n_features: Optional[int] = None, random_state: int = 42, batch_size: int = BATCH_SIZE):
+        # Default width keeps coef_ resident in half the L1 data cache (4096 on a 32 KiB L1d).
+        if n_features is None:
+            n_features = _cache_fit_n_features()
+        # Hashing is stateless (no fit required), perfect for streaming.
+        # Every hashing path reduces with `h & mask` instead of a modulo, which needs a
+        # power-of-two width; saved models record n_features and mask and are checked on load.
+        if n_features <= 0 or n_features & (n_features - 1):
+            raise ValueError(f"n_features must be a power of two, got {n_features}")
+        self.n_features = n_features
+        self._mask = n_features - 1
         # SGDRegressor supports partial_fit for regression.
-        self.model = SGDRegressor(
+        self.model = SalesSGDRegressor(
             loss="squared_error",
             penalty="l2",
             alpha=1e-4,
@@ -105,18 +310,160 @@ class OnlineSalesPredictor:
             warm_start=True,
         )
         self._is_initialized = False
-
-    def _vectorize(self, records: List[Dict[str, float]]):
-        X = self.hasher.transform(records)  # returns sparse matrix
-        return X
+        # Write-behind buffer of labelled samples. It holds each Sample's cached feature dict
+        # (already built by the predict() that preceded the label), so a flush hashes nothing.
+        self.batch_size = batch_size
+        self._pending_records: List[Dict[int, float]] = []
+        self._pending_y: List[float] = []
+        # CSR buffers reused by every _vectorize call; grown on demand, never shrunk.
+        self._buf_indices = np.empty(_CSR_BUFFER_ROWS * _MAX_ROW_NNZ, dtype=np.int32)
+        self._buf_data = np.empty(_CSR_BUFFER_ROWS * _MAX_ROW_NNZ, dtype=DTYPE)
+        self._buf_indptr = np.empty(_CSR_BUFFER_ROWS + 1, dtype=np.int32)
+        # Coefficients changed since the last save; save() writes only these as a delta record
+        # unless something touched every weight (sklearn's partial_fit decays them all).
+        self._dirty = np.zeros(n_features, dtype=bool)
+        self._dirty_all = True
+        self._snapshot_path: Optional[str] = None  # base file the delta log extends
+        self._snapshot_id = 0  # stamped into the base and every delta record written on top of it
+        self._delta_seq = 0
+        self._last_save_time = time.monotonic()
+        self._updates_since_save = 0
+
+    def _vectorize(self, records: List[Dict[int, float]]) -> csr_matrix:
+        """CSR matrix of pre-hashed feature dicts, one row per record.
+
+        The matrix is a view over buffers shared by every _vectorize/_vectorize_columns call
+        and is overwritten by the next one; .copy() it to keep it longer than that.
+        """
+        # Same layout as FeatureHasher(input_type="dict"), built by the _numba_hash kernel.
+        # Keys arrive pre-hashed and unique per sample, so there is no hashing or merge pass.
+        # Two keys can still share a column after masking. Unlike FeatureHasher, the row then
+        # keeps both entries: sparse products add them, and fast_partial_fit merges them first.
+        total_nnz = sum(len(rec) for rec in records)
+        key_hashes = np.fromiter((k for rec in records for k in rec), dtype=np.int64, count=total_nnz)
+        values = np.fromiter((v for rec in records for v in rec.values()), dtype=DTYPE, count=total_nnz)
+        row_lengths = np.fromiter((len(rec) for rec in records), dtype=np.int64, count=len(records))
+        return self._csr(key_hashes, values, row_lengths)
+
+    def _csr(self, key_hashes: np.ndarray, values: np.ndarray, row_lengths: np.ndarray) -> csr_matrix:
+        # The matrix is a view over the shared buffers (see _vectorize): only valid until the next call.
+        n_rows = row_lengths.shape[0]
+        nnz = key_hashes.shape[0]
+        if nnz > self._buf_indices.shape[0]:
+            size = max(nnz, 2 * self._buf_indices.shape[0])
+            self._buf_indices = np.empty(size, dtype=np.int32)
+            self._buf_data = np.empty(size, dtype=DTYPE)
+        if n_rows + 1 > self._buf_indptr.shape[0]:
+            self._buf_indptr = np.empty(max(n_rows + 1, 2 * self._buf_indptr.shape[0]), dtype=np.int32)
+        build_csr(key_hashes, values, row_lengths, n_rows, self._mask,
+                  self._buf_indices, self._buf_data, self._buf_indptr)
+        return csr_matrix((self._buf_data[:nnz], self._buf_indices[:nnz], self._buf_indptr[:n_rows + 1]),
+                          shape=(n_rows, self.n_features), copy=False)
+
+    def _vectorize_columns(self, region, sector, regain, dow, month, leads, avg_ticket) -> csr_matrix:
+        """Columnar _vectorize; the result aliases the same shared buffers."""
+        # Columnar twin of Sample.to_feature_dict: every row gets the same feature slots and
+        # absent ones are masked out before the flat buffers go to the CSR kernel.
+        # dow/month are int arrays with -1 where the date was malformed (see _parse_date_column).
+        n = len(region)
+        dow = np.asarray(dow, dtype=np.int64)
+        month = np.asarray(month, dtype=np.int64)
+        has_date = (dow >= 0) & (month >= 1)
+        keys = np.zeros((n, 7), dtype=np.int64)
+        values = np.ones((n, 7), dtype=DTYPE)
+        present = np.ones((n, 7), dtype=bool)
+        keys[:, 0] = [_feature_key("region=", r) for r in region]
+        keys[:, 1] = [_feature_key("sector=", s) for s in sector]
+        keys[:, 2] = [_feature_key("regain=", g) if g else 0 for g in regain]
+        present[:, 2] = [bool(g) for g in regain]
+        keys[:, 3] = _DOW_KEY_ARRAY[np.where(has_date, dow, 0)]
+        keys[:, 4] = _MONTH_KEY_ARRAY[np.where(has_date, month, 0)]
+        present[:, 3] = present[:, 4] = has_date
+        keys[:, 5] = _LEADS_KEY
+        keys[:, 6] = _AVG_TICKET_KEY
+        values[:, 5] = np.asarray(leads, dtype=DTYPE)  # None -> nan
+        values[:, 6] = np.asarray(avg_ticket, dtype=DTYPE)
+        present[:, 5:] = ~np.isnan(values[:, 5:])
+
+        return self._csr(keys[present], values[present], present.sum(axis=1))
+
+    def partial_fit_columns(self, region, sector, regain, dow, month, leads, avg_ticket, y,
+                            batch_sizes=(None,)):
+        """partial_fit on parallel columns instead of Sample objects (see _vectorize_columns)."""
+        X = self._vectorize_columns(region, sector, regain, dow, month, leads, avg_ticket)
+        self.partial_fit_ladder(X, np.asarray(y, dtype=DTYPE), batch_sizes)
 
     def partial_fit(self, samples: List[Sample], y: List[float]):
         records = [s.to_feature_dict() for s in samples]
         X = self._vectorize(records)
-        y = np.asarray(y, dtype=float)
-        # For regression, partial_fit does not require 'classes' arg
-        self.model.partial_fit(X, y)
+        self._update(X, np.asarray(y, dtype=DTYPE), fast=True)
+
+    def _update(self, X: csr_matrix, y: np.ndarray, fast: bool = False):
+        # fast_partial_fit skips sklearn's input validation; one NaN would spread into coef_
+        # (and from there into every saved delta), so check here for both paths.
+        if not (np.isfinite(y).all() and np.isfinite(X.data).all()):
+            raise ValueError("Input contains NaN or infinity; update skipped.")
+        # fast_partial_fit only decays the weights a row touches, so it is opt-in for the small
+        # interactive batches; warm-start batches (even a short tail) get sklearn's full update.
+        if fast and self._is_initialized and X.shape[0] <= FAST_UPDATE_MAX_ROWS:
+            self.model.fast_partial_fit(X, y)
+            self._dirty[X.indices] = True
+        else:
+            self._dirty_all = True
+            # For regression, partial_fit does not require 'classes' arg
+            self.model.partial_fit(X, y)
         self._is_initialized = True
+        self._updates_since_save += X.shape[0]
+
+    def partial_fit_ladder(self, X: csr_matrix, y: np.ndarray, batch_sizes=WARMSTART_BATCH_LADDER):
+        """One pass over (X, y) per entry of batch_sizes, in partial_fit calls of that many rows."""
+        n = X.shape[0]
+        for size in batch_sizes:
+            step = size or n
+            for start in range(0, n, step):
+                self._update(X[start:start + step], y[start:start + step])
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending_y)
+
+    def enqueue(self, sample: Sample, y: float) -> bool:
+        """Buffer a labelled sample; returns True if this filled the batch and triggered a flush.
+
+        Raises ValueError (and buffers nothing) if the label or a numeric feature is not finite.
+        """
+        # Checked after the cast to DTYPE, as they will be learned: 1e39 is finite as a Python
+        # float but inf in float32, and would otherwise fail the whole batch at flush time.
+        with np.errstate(over="ignore"):
+            if not np.isfinite(DTYPE(y)):
+                raise ValueError(f"Label must be a finite number, got {y!r}; update skipped.")
+            for name in ("leads", "avg_ticket"):
+                value = getattr(sample, name)
+                if value is not None and not np.isfinite(DTYPE(value)):
+                    raise ValueError(f"{name} must be a finite number, got {value!r}; update skipped.")
+        self._pending_records.append(sample.to_feature_dict())
+        self._pending_y.append(y)
+        if self.pending_count >= self.batch_size:
+            self.flush()
+            return True
+        return False
+
+    def flush(self) -> int:
+        """Learn from all buffered samples in one partial_fit. Returns the batch size.
+
+        The buffer is emptied even if the update raises, so a bad batch is dropped, not retried.
+        """
+        n = self.pending_count
+        if n == 0:
+            return 0
+        records, y = self._pending_records, self._pending_y
+        self._pending_records = []
+        self._pending_y = []
+        try:
+            self._update(self._vectorize(records), np.asarray(y, dtype=DTYPE), fast=True)
+        except ValueError as e:
+            raise ValueError(f"Dropped {n} queued label(s): {e}") from e
+        return n
 
     def predict(self, samples: List[Sample]) -> np.ndarray:
         records = [s.to_feature_dict() for s in samples]
@@ -124,46 +471,271 @@ class OnlineSalesPredictor:
         if not self._is_initialized:
             # Cold start: if model hasn't seen data, default to zeros
             return np.zeros(X.shape[0])
+        if X.shape[0] == 1:
+            # A single row has a handful of nonzeros: gathering them from coef_ directly is far
+            # cheaper than SGDRegressor.predict's validation and sparse-dot dispatch.
+            coef = self.model.coef_
+            return np.array([np.dot(coef[X.indices], X.data) + self.model.intercept_[0]])
         return self.model.predict(X)
 
     def save(self, path: str = MODEL_PATH):
-        joblib.dump({
-            "model": self.model,
-            "n_features": self.hasher.n_features,
-        }, path)
+        # Small online updates only append the touched weights to the delta log; anything else
+        # (first save, new path, sklearn-wide updates, or a log grown past half the base) rewrites
+        # the base file and starts a fresh log.
+        delta_path = path + DELTA_SUFFIX
+        buffers_path = path + BUFFERS_SUFFIX
+        if (not self._dirty_all and path == self._snapshot_path and os.path.exists(buffers_path)
+                and (not os.path.exists(delta_path)
+                     or os.path.getsize(delta_path) < os.path.getsize(buffers_path) // 2)):
+            self._append_delta(delta_path)
+        else:
+            self._save_base(path)
+        self._last_save_time = time.monotonic()
+        self._updates_since_save = 0
+
+    def maybe_save(self, path: str = MODEL_PATH, min_interval_s: float = SAVE_MIN_INTERVAL_S,
+                   every_n: int = SAVE_EVERY_N) -> bool:
+        """Debounced save: only with unsaved updates, once every_n of them or min_interval_s have passed."""
+        if self._updates_since_save == 0:
+            return False
+        if (self._updates_since_save < every_n
+                and time.monotonic() - self._last_save_time < min_interval_s):
+            return False
+        self.save(path)
+        return True
+
+    def close(self, path: str = MODEL_PATH):
+        """Learn any queued labels and save if anything is unsaved; main() registers this with atexit."""
+        try:
+            self.flush()
+        finally:
+            if self._updates_since_save:
+                self.save(path)
+
+    def _save_base(self, path: str):
+        # Pickle protocol 5: settings and SGD state go in the pickle, while the float32 weights
+        # (coef_ followed by intercept_) are handed over zero-copy as out-of-band buffers and
+        # written raw, length-prefixed, to path + ".bin" after an 8-byte snapshot id.
+        # Both files are written to temporaries and swapped in with os.replace (.bin first,
+        # .pkl last); the old delta log is removed only afterwards. Its records carry the old
+        # snapshot id, so if we crash before removing it they are ignored rather than replayed.
+        snapshot_id = max(time.time_ns(), self._snapshot_id + 1)
+        weights = np.zeros(self.n_features + 1, dtype=DTYPE)
+        if self._is_initialized:
+            weights[:-1] = self.model.coef_
+            weights[-1] = self.model.intercept_[0]
+        state = {
+            "snapshot_id": snapshot_id,
+            "n_features": self.n_features,
+            "mask": self._mask,
+            "params": self.model.get_params(),
+            "t_": getattr(self.model, "t_", None),
+            "initialized": self._is_initialized,
+            "weights": weights,
+        }
+        buffers_path = path + BUFFERS_SUFFIX
+        buffers: List[pickle.PickleBuffer] = []
+        with open(path + ".tmp", "wb") as f:
+            pickle.dump(state, f, protocol=5, buffer_callback=buffers.append)
+            f.flush()
+            os.fsync(f.fileno())
+        with open(buffers_path + ".tmp", "wb") as b:
+            b.write(struct.pack("<Q", snapshot_id))
+            for buf in buffers:
+                raw = buf.raw()
+                b.write(struct.pack("<Q", raw.nbytes))
+                b.write(raw)
+            b.flush()
+            os.fsync(b.fileno())
+        os.replace(buffers_path + ".tmp", buffers_path)
+        os.replace(path + ".tmp", path)
+        delta_path = path + DELTA_SUFFIX
+        if os.path.exists(delta_path):
+            os.remove(delta_path)
+        self._dirty[:] = False
+        self._dirty_all = False
+        self._snapshot_path = path
+        self._snapshot_id = snapshot_id
+        self._delta_seq = 0
+
+    def _append_delta(self, delta_path: str):
+        # Record: int64 [snapshot_id, seq, count], float64 t_, int32 indices, DTYPE values, DTYPE intercept;
+        # Zstd-compressed and framed by a 4-byte length so a torn final write can be detected on load.
+        idx = np.flatnonzero(self._dirty).astype(np.int32)
+        if idx.size == 0:
+            return
+        self._delta_seq += 1
+        raw = b"".join((
+            np.array([self._snapshot_id, self._delta_seq, idx.size], dtype=np.int64).tobytes(),
+            np.array([self.model.t_], dtype=np.float64).tobytes(),
+            idx.tobytes(),
+            self.model.coef_[idx].astype(DTYPE).tobytes(),
+            np.array([self.model.intercept_[0]], dtype=DTYPE).tobytes(),
+        ))
+        payload = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+        with open(delta_path, "ab") as f:
+            f.write(struct.pack("<I", len(payload)) + payload)
+        self._dirty[idx] = False
+
+    def _replay_deltas(self, delta_path: str) -> bool:
+        """Apply the delta log on top of the loaded base; False if it ended in a damaged record."""
+        with open(delta_path, "rb") as f:
+            blob = f.read()
+        coef, intercept = self.model.coef_, self.model.intercept_
+        item = np.dtype(DTYPE).itemsize
+        dctx = zstandard.ZstdDecompressor()
+        pos = 0
+        while pos < len(blob):
+            if pos + 4 > len(blob):
+                return False
+            (size,) = struct.unpack_from("<I", blob, pos)
+            payload = blob[pos + 4:pos + 4 + size]
+            if len(payload) < size:
+                return False
+            try:
+                raw = dctx.decompress(payload)
+            except zstandard.ZstdError:
+                return False
+            snapshot_id, seq, count = (int(v) for v in np.frombuffer(raw, dtype=np.int64, count=3))
+            if snapshot_id != self._snapshot_id or seq != self._delta_seq + 1:
+                return False  # left over from an older base, or out of order
+            t_ = float(np.frombuffer(raw, dtype=np.float64, count=1, offset=24)[0])
+            idx = np.frombuffer(raw, dtype=np.int32, count=count, offset=32)
+            if count and (idx.min() < 0 or idx.max() > self._mask):
+                return False  # written for a different n_features
+            values = np.frombuffer(raw, dtype=DTYPE, count=count, offset=32 + 4 * count)
+            coef[idx] = values
+            intercept[0] = np.frombuffer(raw, dtype=DTYPE, count=1, offset=32 + (4 + item) * count)[0]
+            self.model.t_ = t_
+            self._delta_seq = seq
+            pos += 4 + size
+        return True
+
+    def _restore_weights(self, coef: np.ndarray, intercept: float, t_: Optional[float] = None):
+        # One all-zero partial_fit lets SGDRegressor allocate coef_/intercept_ (zero gradient,
+        # so nothing is learned), then the saved weights and step count are copied over them.
+        self.model.partial_fit(csr_matrix((1, self.n_features), dtype=DTYPE), np.zeros(1, dtype=DTYPE))
+        self.model.coef_[:] = coef
+        self.model.intercept_[:] = intercept
+        if t_ is not None:
+            self.model.t_ = t_
+        self._is_initialized = True
 
     @staticmethod
-    def load(path: str = MODEL_PATH) -> "OnlineSalesPredictor":
+    def load_legacy(path: str) -> "OnlineSalesPredictor":
+        """Read a model saved by an earlier version: a joblib dump or a flat .npy of weights.
+
+        Feature hashing has not changed since those formats, so the weights carry over as-is.
+        """
+        if path.endswith(".npy"):
+            weights = np.load(path)
+            predictor = OnlineSalesPredictor(n_features=weights.shape[0] - 1)
+            predictor._restore_weights(weights[:-1], weights[-1])
+            return predictor
+        import joblib  # installed with scikit-learn; only needed for this one-time migration
+
         state = joblib.load(path)
+        old = state["model"]
         predictor = OnlineSalesPredictor(n_features=state["n_features"])
-        predictor.model = state["model"]
-        predictor._is_initialized = True
+        predictor.model.set_params(**old.get_params())
+        if hasattr(old, "coef_"):
+            predictor._restore_weights(old.coef_, old.intercept_[0], getattr(old, "t_", None))
+        return predictor
+
+    @staticmethod
+    def load(path: str = MODEL_PATH) -> "OnlineSalesPredictor":
+        with open(path + BUFFERS_SUFFIX, "rb") as b:
+            blob = memoryview(b.read())
+        (snapshot_id,) = struct.unpack_from("<Q", blob, 0)
+        buffers = []
+        pos = 8
+        while pos < len(blob):
+            (size,) = struct.unpack_from("<Q", blob, pos)
+            buffers.append(blob[pos + 8:pos + 8 + size])
+            pos += 8 + size
+        with open(path, "rb") as f:
+            state = pickle.load(f, buffers=buffers)
+
+        n_features = state["n_features"]
+        if state["mask"] != n_features - 1:
+            raise ValueError(f"Saved mask {state['mask']:#x} does not match n_features={n_features}")
+        weights = state["weights"]
+        if weights.shape != (n_features + 1,):
+            raise ValueError(f"{path + BUFFERS_SUFFIX} does not match {path} (interrupted save?)")
+        predictor = OnlineSalesPredictor(n_features=n_features)
+        predictor.model.set_params(**state["params"])
+        predictor._snapshot_path = path
+        # The .bin is swapped in first, so its id names the newest weights and decides which
+        # deltas apply; a .pkl left behind by an interrupted save only costs stale settings,
+        # and the next save rewrites a matching pair.
+        predictor._snapshot_id = snapshot_id
+        in_sync = state["snapshot_id"] == snapshot_id
+        if not state["initialized"]:
+            predictor._dirty_all = not in_sync
+            return predictor
+        predictor._restore_weights(weights[:-1], weights[-1], state["t_"])
+        intact = True
+        if os.path.exists(path + DELTA_SUFFIX):
+            intact = predictor._replay_deltas(path + DELTA_SUFFIX)
+        # A damaged log tail can't be appended to; the next save rewrites the base instead.
+        predictor._dirty_all = not (intact and in_sync)
         return predictor
 
 
+def _text_column(chunk: pd.DataFrame, col: str, default: str) -> np.ndarray:
+    if col not in chunk:
+        return np.full(len(chunk), default, dtype=object)
+    return chunk[col].fillna("").to_numpy(dtype=object)
+
+
+def _number_column(chunk: pd.DataFrame, col: str) -> np.ndarray:
+    if col not in chunk:
+        return np.full(len(chunk), np.nan)
+    return pd.to_numeric(chunk[col]).to_numpy(dtype=np.float64)
+
+
+def _parse_date_column(dates: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(day_of_week, month) int arrays for a whole CSV chunk in one pandas C pass, -1 where malformed."""
+    parsed = pd.to_datetime(pd.Series(dates), format="%Y-%m-%d", errors="coerce", cache=True)
+    dow = parsed.dt.weekday.fillna(-1).to_numpy(dtype=np.int64)
+    month = parsed.dt.month.fillna(-1).to_numpy(dtype=np.int64)
+    return dow, month
+
+
 def warmstart_from_csv(predictor: OnlineSalesPredictor, csv_path: str, target_col: str = "sales"):
-    with open(csv_path, newline="") as f:
-        reader = csv.DictReader(f)
-        samples: List[Sample] = []
-        targets: List[float] = []
-        for row in reader:
-            if target_col not in row or not row[target_col]:
+    # Streamed in chunks of columns: no per-row Sample objects, and each chunk goes through
+    # the batch ladder on its own.
+    today = datetime.now().strftime("%Y-%m-%d")
+    n_rows = 0
+    try:
+        # Only empty cells count as missing; strings like "NA" stay valid categories.
+        chunks = pd.read_csv(csv_path, chunksize=WARMSTART_CHUNK_ROWS, keep_default_na=False, na_values=[""],
+                             dtype={"region": str, "sector": str, "regain": str, "date": str})
+        for chunk in chunks:
+            if target_col not in chunk:
+                break
+            chunk = chunk[chunk[target_col].notna()]
+            if chunk.empty:
                 continue
-            sample = Sample(
-                region=row.get("region", ""),
-                sector=row.get("sector", ""),
-                regain=row.get("regain") or None,
-                date=row.get("date", datetime.now().strftime("%Y-%m-%d")),
-                leads=float(row["leads"]) if row.get("leads") else None,
-                avg_ticket=float(row["avg_ticket"]) if row.get("avg_ticket") else None,
+            dow, month = _parse_date_column(_text_column(chunk, "date", today))
+            predictor.partial_fit_columns(
+                _text_column(chunk, "region", ""),
+                _text_column(chunk, "sector", ""),
+                _text_column(chunk, "regain", ""),
+                dow,
+                month,
+                _number_column(chunk, "leads"),
+                _number_column(chunk, "avg_ticket"),
+                _number_column(chunk, target_col),
+                batch_sizes=WARMSTART_BATCH_LADDER,
             )
-            samples.append(sample)
-            targets.append(float(row[target_col]))
-        if samples:
-            predictor.partial_fit(samples, targets)
-            print(f"Warm-started on {len(samples)} rows from {csv_path}.")
-        else:
-            print("No valid rows found to warm-start.")
+            n_rows += len(chunk)
+    except pd.errors.EmptyDataError:
+        pass
+    if n_rows:
+        print(f"Warm-started on {n_rows} rows from {csv_path}.")
+    else:
+        print("No valid rows found to warm-start.")
 
 
 def prompt_sample_interactive() -> Sample:
@@ -184,12 +756,14 @@ def prompt_json_mode() -> Sample:
           "{""region"": ""South"", ""sector"": ""Retail"", ""regain"": ""Tier2"", ""date"": ""2025-08-14"", ""leads"": 42, ""avg_ticket"": 799.0}")
     while True:
         try:
-            raw = input("
-JSON > ").strip()
+            raw = input("\nJSON > ").strip()
             obj = json.loads(raw)
             region = str(obj.get("region", ""))
             sector = str(obj.get("sector", ""))
             regain = obj.get("regain")
+            # Feature keys are memoized per value, so non-string JSON values (lists, objects,
+            # numbers) are stored as their text, which is what they hashed as before.
+            regain = str(regain) if regain else None
             date = obj.get("date") or datetime.now().strftime("%Y-%m-%d")
             leads = float(obj["leads"]) if "leads" in obj and obj["leads"] is not None else None
             avg_ticket = float(obj["avg_ticket"]) if "avg_ticket" in obj and obj["avg_ticket"] is not None else None
@@ -198,60 +772,106 @@ JSON > ").strip()
             print(f"Invalid JSON, try again: {e}")
 
 
+def migrate_legacy_model(path: str = MODEL_PATH):
+    """If only an older model file exists, convert it to the current format once (it is kept)."""
+    if os.path.exists(path):
+        return
+    for legacy in LEGACY_MODEL_PATHS:
+        if not os.path.exists(legacy):
+            continue
+        try:
+            predictor = OnlineSalesPredictor.load_legacy(legacy)
+        except Exception as e:
+            print(f"Found {legacy} but could not migrate it ({e}).")
+            return
+        predictor.save(path)
+        print(f"Migrated {legacy} to {path}.")
+        return
+
+
 def main():
     parser = argparse.ArgumentParser(description="Online real-time sales predictor (region/sector)")
     parser.add_argument("--warmstart", type=str, default=None, help="Optional CSV path to pre-train the model")
     args = parser.parse_args()
 
+    migrate_legacy_model(MODEL_PATH)
+    save_path: Optional[str] = MODEL_PATH
     if os.path.exists(MODEL_PATH):
         try:
             predictor = OnlineSalesPredictor.load(MODEL_PATH)
             print(f"Loaded existing model from {MODEL_PATH}.")
-        except Exception:
+        except Exception as e:
+            # Never save over a model we could not read; it may still be recoverable by hand.
             predictor = OnlineSalesPredictor()
-            print("Could not load existing model, starting fresh.")
+            save_path = None
+            print(f"Could not load existing model ({e}), starting fresh (n_features={predictor.n_features}).")
+            print(f"{MODEL_PATH} is left untouched; this session will not be saved.")
     else:
         predictor = OnlineSalesPredictor()
-        print("Starting with a fresh model.")
+        print(f"Starting with a fresh model (n_features={predictor.n_features}).")
+
+    # Whatever is still unsaved on the way out (warm-start included) is saved by close().
+    if save_path is not None:
+        atexit.register(predictor.close, save_path)
 
     if args.warmstart:
         warmstart_from_csv(predictor, args.warmstart)
-        predictor.save(MODEL_PATH)
 
     print("\n=== Real-Time Sales Prediction ===")
     print("Type 'q' at any prompt to quit.\n")
 
-    while True:
-        mode = input("Input mode: [1] Guided prompts  [2] JSON  -> ").strip().lower()
-        if mode == 'q':
-            break
-        if mode not in {"1", "2"}:
-            print("Choose 1 or 2, or q to quit.")
-            continue
-
-        if mode == "1":
-            sample = prompt_sample_interactive()
-        else:
-            sample = prompt_json_mode()
-
-        # Predict
-        pred = predictor.predict([sample])[0]
-        print(f"\nPredicted sales: {pred:.2f}")
+    try:
+        while True:
+            mode = input("Input mode: [1] Guided prompts  [2] JSON  -> ").strip().lower()
+            if mode == 'q':
+                break
+            if mode not in {"1", "2"}:
+                print("Choose 1 or 2, or q to quit.")
+                continue
 
-        # Learn immediately if you have the ground truth
-        actual_s = input("Actual sales (press Enter if unknown): ").strip()
-        if actual_s.lower() == 'q':
-            break
-        if actual_s:
-            try:
-                y = float(actual_s)
-                predictor.partial_fit([sample], [y])
-                predictor.save(MODEL_PATH)
-                print("Model updated and saved.\n")
-            except ValueError:
-                print("Not a number. Skipped update.\n")
-        else:
-            print("No label provided. Model not updated.\n")
+            if mode == "1":
+                sample = prompt_sample_interactive()
+            else:
+                sample = prompt_json_mode()
+
+            # Predict
+            pred = predictor.predict([sample])[0]
+            print(f"\nPredicted sales: {pred:.2f}")
+
+            # Learn from the ground truth (buffered, applied in mini-batches)
+            actual_s = input("Actual sales (press Enter if unknown): ").strip()
+            if actual_s.lower() == 'q':
+                break
+            if actual_s:
+                try:
+                    y = float(actual_s)
+                except ValueError:
+                    print("Not a number. Skipped update.\n")
+                    continue
+                try:
+                    flushed = predictor.enqueue(sample, y)
+                except ValueError as e:
+                    # Either this row was rejected, or the flush it triggered dropped the batch.
+                    print(f"{e}\n")
+                    continue
+                # Checked every labelled round so updates held back by the debounce get saved
+                # once the interval has passed, not only when the next batch is learned.
+                saved = save_path is not None and predictor.maybe_save(save_path)
+                if flushed:
+                    print("Model updated and saved.\n" if saved else "Model updated.\n")
+                else:
+                    print(f"Label queued ({predictor.pending_count}/{predictor.batch_size} until next update)"
+                          + ("; earlier updates saved.\n" if saved else ".\n"))
+            else:
+                print("No label provided. Model not updated.\n")
+    except KeyboardInterrupt:
+        print()
+    finally:
+        try:
+            if predictor.flush() and save_path is not None:
+                print("Applied queued labels; the model is saved on exit.")
+        except ValueError as e:
+            print(e)
 
     print("Goodbye!")
 
@@ -0,0 +1,27 @@
+import os
+import sys
+from datetime import date, timedelta
+
+import pytest
+
+# forcast.py and _numba_hash.py live at the repository root, next to the Node app.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from forcast import Sample  # noqa: E402
+
+
+@pytest.fixture
+def make_samples():
+    """Factory for n distinct, fully populated samples on consecutive days from 2025-01-01."""
+    regions = ["North", "South", "East", "West"]
+    sectors = ["Retail", "Pharma", "Auto"]
+
+    def make(n):
+        return [
+            Sample(region=regions[i % 4], sector=sectors[i % 3], regain=f"T{i % 2}",
+                   date=(date(2025, 1, 1) + timedelta(days=i)).isoformat(), leads=i % 3,
+                   avg_ticket=1.0 + (i % 5) / 10)
+            for i in range(n)
+        ]
+
+    return make
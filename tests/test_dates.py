@@ -0,0 +1,36 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+import forcast
+
+
+def test_zeller_matches_weekday():
+    day = date(1900, 1, 1)
+    while day < date(2101, 1, 1):
+        assert forcast._zeller(day.year, day.month, day.day) == day.weekday()
+        day += timedelta(days=1)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("2024-02-29", (date(2024, 2, 29).weekday(), 2)),
+    ("2025-8-1", (date(2025, 8, 1).weekday(), 8)),
+    ("2023-02-29", None),
+    ("1900-02-29", None),
+    ("2025-13-01", None),
+    ("not a date", None),
+    (None, None),
+])
+def test_date_features(text, expected):
+    assert forcast._date_features(text) == expected
+
+
+def test_parse_date_column_matches_date_features():
+    # Warm-start parses a whole column with pandas; it must agree with the per-sample parser.
+    dates = ["2025-08-14", "2025-8-1", "2024-02-29", "2023-02-29", "1900-02-29", "2025-13-01", "",
+             " 2025-01-01", "2025-01-01T00:00", "20250101", "２０２５-01-01", "not a date"]
+    dow, month = forcast._parse_date_column(np.array(dates, dtype=object))
+    for text, d, m in zip(dates, dow, month):
+        expected = forcast._date_features(text)
+        assert ((d, m) if d >= 0 else None) == expected, text
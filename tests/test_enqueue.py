@@ -0,0 +1,37 @@
+import pytest
+
+from forcast import OnlineSalesPredictor
+
+
+@pytest.mark.parametrize("label", [float("nan"), float("inf"), 1e39])
+def test_enqueue_rejects_non_finite_label(make_samples, label):
+    predictor = OnlineSalesPredictor(batch_size=2)
+    with pytest.raises(ValueError):
+        predictor.enqueue(make_samples(1)[0], label)
+    assert predictor.pending_count == 0
+
+
+@pytest.mark.parametrize("field", ["leads", "avg_ticket"])
+@pytest.mark.parametrize("value", [float("nan"), float("-inf"), -1e39])
+def test_enqueue_rejects_non_finite_feature(make_samples, field, value):
+    sample = make_samples(1)[0]
+    setattr(sample, field, value)
+    sample.invalidate()
+    predictor = OnlineSalesPredictor(batch_size=2)
+    with pytest.raises(ValueError):
+        predictor.enqueue(sample, 1.0)
+    assert predictor.pending_count == 0
+
+
+def test_rejected_row_keeps_queued_labels(make_samples):
+    # 1e39 overflows float32: it must be turned away before it can poison the queued batch.
+    samples = make_samples(4)
+    predictor = OnlineSalesPredictor(batch_size=4)
+    for sample in samples[:3]:
+        predictor.enqueue(sample, 10.0)
+    with pytest.raises(ValueError):
+        predictor.enqueue(samples[3], 1e39)
+    assert predictor.pending_count == 3
+    assert predictor.enqueue(samples[3], 10.0)
+    assert predictor.pending_count == 0
+    assert predictor.predict(samples[:1])[0] != 0.0
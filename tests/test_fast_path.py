@@ -0,0 +1,48 @@
+import numpy as np
+from scipy.sparse import csr_matrix
+
+import forcast
+from forcast import OnlineSalesPredictor, Sample, SalesSGDRegressor
+
+
+def _regressor(alpha):
+    return SalesSGDRegressor(loss="squared_error", penalty="l2", alpha=alpha, learning_rate="adaptive",
+                             eta0=0.01, max_iter=1, shuffle=False, warm_start=True, random_state=0)
+
+
+def test_fast_partial_fit_matches_sklearn(make_samples):
+    # With no L2 penalty the lazy, touched-only decay is exact, so the fast path must follow
+    # sklearn's own unshuffled sparse update step for step.
+    predictor = OnlineSalesPredictor()
+    X = predictor._vectorize([s.to_feature_dict() for s in make_samples(48)]).copy()
+    y = np.linspace(50.0, 150.0, X.shape[0]).astype(forcast.DTYPE)
+
+    fast, reference = _regressor(0.0), _regressor(0.0)
+    fast.partial_fit(X[:16], y[:16])
+    reference.partial_fit(X[:16], y[:16])
+    for start in range(16, X.shape[0], 8):
+        fast.fast_partial_fit(X[start:start + 8], y[start:start + 8])
+        reference.partial_fit(X[start:start + 8], y[start:start + 8])
+
+    np.testing.assert_allclose(fast.coef_, reference.coef_, rtol=1e-5, atol=1e-5)
+    np.testing.assert_allclose(fast.intercept_, reference.intercept_, rtol=1e-5, atol=1e-5)
+    assert fast.t_ == reference.t_
+
+
+def test_fast_partial_fit_sums_colliding_columns():
+    # "region=R158" and "dow=2" (2025-01-01 is a Wednesday) share a column at n_features=4096.
+    predictor = OnlineSalesPredictor(n_features=4096)
+    X = predictor._vectorize([Sample(region="R158", sector="X", date="2025-01-01").to_feature_dict()]).copy()
+    assert len(np.unique(X.indices)) < X.nnz
+    y = np.array([100.0], dtype=forcast.DTYPE)
+
+    # Starting from zero weights, one step decays nothing, so the default penalty still matches.
+    fast, reference = _regressor(1e-4), _regressor(1e-4)
+    zero = csr_matrix((1, 4096), dtype=forcast.DTYPE)
+    for model in (fast, reference):
+        model.partial_fit(zero, np.zeros(1, dtype=forcast.DTYPE))
+    fast.fast_partial_fit(X, y)
+    reference.partial_fit(X, y)
+
+    np.testing.assert_allclose(fast.coef_, reference.coef_, rtol=1e-5, atol=1e-6)
+    np.testing.assert_allclose(fast.intercept_, reference.intercept_, rtol=1e-5, atol=1e-6)
@@ -0,0 +1,38 @@
+from datetime import datetime
+
+import numpy as np
+from sklearn.feature_extraction import FeatureHasher
+
+from forcast import OnlineSalesPredictor, Sample
+
+
+def _string_features(s):
+    # Sample.to_feature_dict as it was when FeatureHasher did the hashing; legacy models
+    # were trained on these columns, so the pre-hashed keys must land on the same ones.
+    d = {f"region={s.region}": 1.0, f"sector={s.sector}": 1.0}
+    if s.regain:
+        d[f"regain={s.regain}"] = 1.0
+    try:
+        dt = datetime.strptime(s.date, "%Y-%m-%d")
+        d[f"dow={dt.weekday()}"] = 1.0
+        d[f"month={dt.month}"] = 1.0
+    except Exception:
+        pass
+    if s.leads is not None:
+        d["leads"] = float(s.leads)
+    if s.avg_ticket is not None:
+        d["avg_ticket"] = float(s.avg_ticket)
+    return d
+
+
+def test_vectorize_matches_feature_hasher(make_samples):
+    samples = make_samples(12) + [
+        Sample(region="R158", sector="X", date="2025-01-01"),  # region and dow share a column
+        Sample(region="South", sector="Retail", date="not a date", leads=-3.0),
+        Sample(region="Süd", sector="", date="2024-02-29", regain="Tier2", avg_ticket=799.0),
+    ]
+    predictor = OnlineSalesPredictor(n_features=4096)
+    X = predictor._vectorize([s.to_feature_dict() for s in samples]).toarray()
+    expected = FeatureHasher(n_features=4096, input_type="dict").transform(
+        [_string_features(s) for s in samples]).toarray()
+    np.testing.assert_allclose(X, expected, rtol=1e-6)
@@ -0,0 +1,80 @@
+import os
+
+import numpy as np
+
+import forcast
+from forcast import DELTA_SUFFIX, OnlineSalesPredictor
+
+
+def test_torn_delta_record_is_dropped_and_compacted(tmp_path, make_samples):
+    path = str(tmp_path / "model.pkl")
+    samples = make_samples(20)
+    predictor = OnlineSalesPredictor(batch_size=1)
+    predictor.partial_fit(samples[:16], [100.0] * 16)
+    predictor.save(path)
+    assert not os.path.exists(path + DELTA_SUFFIX)
+
+    predictor.enqueue(samples[16], 120.0)
+    predictor.save(path)
+    predictor.enqueue(samples[17], 80.0)
+    predictor.save(path)
+    coef, intercept, t_ = predictor.model.coef_.copy(), predictor.model.intercept_.copy(), predictor.model.t_
+    predictor.enqueue(samples[18], 90.0)
+    predictor.save(path)
+
+    # Tear the last delta record, as a crash halfway through the append would.
+    delta_path = path + DELTA_SUFFIX
+    with open(delta_path, "r+b") as f:
+        f.truncate(os.path.getsize(delta_path) - 3)
+
+    restored = OnlineSalesPredictor.load(path)
+    np.testing.assert_array_equal(restored.model.coef_, coef)
+    # The intercept is persisted in DTYPE, like the weights.
+    np.testing.assert_array_equal(restored.model.intercept_, intercept.astype(forcast.DTYPE))
+    assert restored.model.t_ == t_
+    assert restored._dirty_all
+
+    # The next save rewrites the base and starts a fresh delta log.
+    restored.save(path)
+    assert not os.path.exists(delta_path)
+    reloaded = OnlineSalesPredictor.load(path)
+    np.testing.assert_array_equal(reloaded.model.coef_, coef)
+    assert reloaded.model.t_ == t_
+    np.testing.assert_array_equal(reloaded.predict(samples[:4]), restored.predict(samples[:4]))
+
+
+def test_maybe_save_debounce(tmp_path, make_samples, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(forcast.time, "monotonic", lambda: now[0])
+    path = str(tmp_path / "model.pkl")
+    samples = make_samples(8)
+    predictor = OnlineSalesPredictor(batch_size=1)
+
+    assert not predictor.maybe_save(path)  # nothing learned yet
+    predictor.enqueue(samples[0], 10.0)
+    assert not predictor.maybe_save(path, min_interval_s=2.0, every_n=4)  # too soon
+    assert not os.path.exists(path)
+    now[0] += 2.5
+    assert predictor.maybe_save(path, min_interval_s=2.0, every_n=4)  # interval passed
+    assert os.path.exists(path)
+    assert not predictor.maybe_save(path, min_interval_s=2.0, every_n=4)  # nothing new
+
+    for sample in samples[1:5]:
+        predictor.enqueue(sample, 10.0)
+    assert predictor.maybe_save(path, min_interval_s=2.0, every_n=4)  # enough updates, no wait
+
+
+def test_close_saves_only_unsaved_work(tmp_path, make_samples):
+    path = str(tmp_path / "model.pkl")
+    predictor = OnlineSalesPredictor(batch_size=4)
+    predictor.close(path)
+    assert not os.path.exists(path)
+
+    predictor.enqueue(make_samples(1)[0], 10.0)  # queued, not yet learned
+    predictor.close(path)
+    assert predictor.pending_count == 0
+    snapshot_id = OnlineSalesPredictor.load(path)._snapshot_id
+
+    predictor.close(path)
+    assert OnlineSalesPredictor.load(path)._snapshot_id == snapshot_id
+    assert not os.path.exists(path + DELTA_SUFFIX)
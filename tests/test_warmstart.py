@@ -0,0 +1,48 @@
+import numpy as np
+
+import forcast
+from forcast import OnlineSalesPredictor, Sample, SalesSGDRegressor
+
+
+def _write_csv(path, samples, sales):
+    with open(path, "w") as f:
+        f.write("region,sector,regain,date,leads,avg_ticket,sales\n")
+        for s, y in zip(samples, sales):
+            f.write(f"{s.region},{s.sector},{s.regain},{s.date},{s.leads},{s.avg_ticket},{y}\n")
+
+
+def test_vectorize_columns_matches_feature_dicts(make_samples):
+    samples = make_samples(8) + [
+        Sample(region="R158", sector="X", date="2025-01-01"),
+        Sample(region="South", sector="Retail", date="not a date", leads=-3.0),
+        Sample(region="North", sector="Auto", date="2025-8-1", regain="Tier2", avg_ticket=799.0),
+    ]
+    predictor = OnlineSalesPredictor()
+    expected = predictor._vectorize([s.to_feature_dict() for s in samples]).toarray()
+    dow, month = forcast._parse_date_column(np.array([s.date for s in samples], dtype=object))
+    X = predictor._vectorize_columns(
+        [s.region for s in samples],
+        [s.sector for s in samples],
+        [s.regain or "" for s in samples],  # _text_column turns empty cells into ""
+        dow,
+        month,
+        [np.nan if s.leads is None else s.leads for s in samples],  # _number_column: empty -> nan
+        [np.nan if s.avg_ticket is None else s.avg_ticket for s in samples],
+    ).toarray()
+    np.testing.assert_array_equal(X, expected)
+
+
+def test_warmstart_never_takes_the_fast_path(tmp_path, make_samples, monkeypatch):
+    # A CSV of at most FAST_UPDATE_MAX_ROWS rows on a trained model: every ladder batch is small.
+    samples = make_samples(forcast.FAST_UPDATE_MAX_ROWS)
+    predictor = OnlineSalesPredictor()
+    predictor.partial_fit(samples, [100.0] * len(samples))
+
+    def fail(self, X, y):
+        raise AssertionError("warm-start used fast_partial_fit")
+
+    monkeypatch.setattr(SalesSGDRegressor, "fast_partial_fit", fail)
+    csv_path = tmp_path / "sales.csv"
+    _write_csv(csv_path, samples, np.linspace(50.0, 150.0, len(samples)))
+    forcast.warmstart_from_csv(predictor, str(csv_path))
+    assert predictor._dirty_all